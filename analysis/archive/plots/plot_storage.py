@@ -1,58 +1,215 @@
 #!/usr/bin/env python3
 # Path: analysis/plots/plot_storage.py
-# Revision: 2.0
+# Revision: 2.1
 # Description: Visualizes storage growth and forecasts disk full events.
 #              Handles mixed CSV formats (legacy 3-col vs new 4-col with node_name).
 
+import numpy as np
 import pandas as pd
+from pandas.api.types import is_datetime64_any_dtype
+import matplotlib
+matplotlib.use('Agg')  # headless PNG output; no GUI backend probing
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
 from datetime import datetime
 import os
-import csv
+import io
+import json
+import hashlib
 import sys
 
+# Disk counters are read as float32: even a 100 TB disk (~1e11 KB) resolves
+# to ~8 MB steps, far below what the GB-scale plot and forecast can show.
+try:
+    import pyarrow
+    import pyarrow.parquet as pq
+    # Multi-threaded Arrow CSV reader; columns stay Arrow-backed until plotting.
+    # Timestamps are typed up front so Arrow parses them in C++ during the read.
+    READ_OPTIONS = {'engine': 'pyarrow', 'dtype_backend': 'pyarrow'}
+    FLOAT_DTYPE = 'float[pyarrow]'
+    COLUMN_DTYPES = {'timestamp': pd.ArrowDtype(pyarrow.timestamp('ns', tz='UTC'))}
+except ImportError:
+    READ_OPTIONS = {'engine': 'c'}
+    FLOAT_DTYPE = 'float32'
+    COLUMN_DTYPES = {}
+    pq = None
+
 # --- Configuration ---
 # Look for csv in the logs directory relative to where this script is likely run
 DATA_FILE_PATH = "../../storage_history.csv" 
 OUTPUT_DIR = "output"
 DEFAULT_NODE_NAME = "sensor-unknown"
+KB_TO_GB = 1.0 / (1024 * 1024)
+# New Format: [timestamp, node_name, disk_used, recording_size]
+CURRENT_COLUMNS = ["timestamp", "node_name", "disk_used_kb", "recording_size_kb"]
+LEGACY_COLUMNS = ["timestamp", "disk_used_kb", "recording_size_kb"]
+PLOT_COLUMNS = ["timestamp", "node_name", "disk_used_kb"]
+CHUNK_ROWS = 1 << 20
+DIGEST_BLOCK = 1 << 20
+CACHE_META_KEY = b"storage_history_csv"
+MAX_MARKERS = 200
+DEBUG_CHECKS = os.getenv("PLOT_STORAGE_DEBUG") == "1"
+
+def has_parsed_timestamps(series):
+    """
+    True when the timestamp column is already typed: numpy datetime64 or an
+    Arrow timestamp (ArrowDtype), which is_datetime64_any_dtype(series) misses.
+    """
+    dtype = series.dtype
+    if isinstance(dtype, pd.ArrowDtype):
+        return pyarrow.types.is_timestamp(dtype.pyarrow_dtype)
+    return is_datetime64_any_dtype(dtype)
+
+def concat_history(frames):
+    """
+    Concatenates history frames. Frames with different node_name categories
+    concatenate to object, so the column is re-categorized afterwards.
+    """
+    frames = [f for f in frames if not f.empty]
+    if not frames:
+        return pd.DataFrame()
+    df = pd.concat(frames, ignore_index=True)
+    if 'node_name' in df.columns:
+        df['node_name'] = df['node_name'].astype('category')
+    return df
 
-def load_robust_csv(filepath):
+def reconcile_widths(chunk):
+    """
+    Maps a text chunk read against CURRENT_COLUMNS onto the plotted schema.
+    Legacy 3-field rows arrive with their disk counter in node_name and no
+    recording_size_kb; they are shifted back and tagged DEFAULT_NODE_NAME.
+    """
+    node = chunk['node_name']
+    legacy = chunk['recording_size_kb'].isna() & (node.isna() | pd.to_numeric(node, errors='coerce').notna())
+    disk = pd.to_numeric(chunk['disk_used_kb'].mask(legacy, node), errors='coerce')
+    return pd.DataFrame({
+        'timestamp': chunk['timestamp'],
+        'node_name': node.mask(legacy, DEFAULT_NODE_NAME).astype('category'),
+        'disk_used_kb': disk.fillna(0).astype('float32'),
+    })
+
+def load_robust_csv(filepath, offset=0):
     """
     Reads a CSV that may have changing column counts (schema evolution).
-    Returns a normalized DataFrame.
+    Returns a normalized DataFrame. A non-zero offset parses only the rows
+    from that byte position on (used for appended tails).
     """
-    rows = []
     if not os.path.exists(filepath):
         print(f"❌ File not found: {filepath}")
         return pd.DataFrame()
 
-    with open(filepath, 'r') as f:
-        reader = csv.reader(f)
-        header = next(reader, None)
-        
-        for line in reader:
-            if not line: continue
-            
-            # Legacy Format: [timestamp, disk_used, recording_size]
-            if len(line) == 3:
-                rows.append({
-                    "timestamp": line[0],
-                    "node_name": DEFAULT_NODE_NAME,
-                    "disk_used_kb": float(line[1]) if line[1] else 0,
-                    "recording_size_kb": float(line[2]) if line[2] else 0
-                })
-            # New Format: [timestamp, node_name, disk_used, recording_size]
-            elif len(line) == 4:
-                rows.append({
-                    "timestamp": line[0],
-                    "node_name": line[1],
-                    "disk_used_kb": float(line[2]) if line[2] else 0,
-                    "recording_size_kb": float(line[3]) if line[3] else 0
-                })
-
-    return pd.DataFrame(rows)
+    with open(filepath, 'rb') as f:
+        header_line = f.readline()
+        if not header_line.strip():
+            return pd.DataFrame()
+
+        legacy = header_line.count(b',') == 2
+        names = LEGACY_COLUMNS if legacy else CURRENT_COLUMNS
+        read_kwargs = dict(na_values=[''], keep_default_na=False)
+
+        # Parse from the same handle instead of reopening the path
+        source = f
+        if offset:
+            # Appended tails are small: re-attach the header so they parse like a full file
+            f.seek(offset)
+            source = io.BytesIO(header_line + f.read())
+        else:
+            f.seek(0)
+        start = source.tell()
+        if READ_OPTIONS['engine'] == 'pyarrow':
+            try:
+                # Arrow reads block-wise straight into columnar buffers. Any row whose
+                # width differs from the header (or a malformed timestamp) raises and
+                # sends the file through the per-row path below.
+                # recording_size_kb is never plotted, so it is dropped at parse time
+                df = pd.read_csv(source, header=0, names=names, usecols=[c for c in PLOT_COLUMNS if c in names],
+                                 dtype={**COLUMN_DTYPES, 'node_name': 'category', 'disk_used_kb': FLOAT_DTYPE},
+                                 on_bad_lines='error', **read_kwargs, **READ_OPTIONS)
+            except (ValueError, pyarrow.ArrowException) as e:
+                print(f"⚠️ Arrow read failed ({str(e).splitlines()[0]}); reconciling rows with the C parser")
+                source.seek(start)
+            else:
+                df['disk_used_kb'] = df['disk_used_kb'].fillna(0)
+                # Legacy Format: [timestamp, disk_used, recording_size]
+                if legacy:
+                    df.insert(1, 'node_name', pd.Series(DEFAULT_NODE_NAME, index=df.index, dtype='category'))
+                return df
+
+        # Mixed 3-/4-field rows: read everything as text against the 4-column
+        # layout and fix up legacy rows. Rows wider than 4 fields are skipped and
+        # timestamps stay text for main()'s guarded parse. Chunks bound the C
+        # parser's working set on multi-GB histories. header=None + skiprows keeps
+        # the C parser from rejecting a 3-field header against 4 names.
+        reader = pd.read_csv(source, header=None, skiprows=1, names=CURRENT_COLUMNS, dtype=str,
+                             engine='c', on_bad_lines='skip', chunksize=CHUNK_ROWS, **read_kwargs)
+        return concat_history(reconcile_widths(chunk) for chunk in reader)
+
+def prefix_digest(filepath, nbytes):
+    """
+    Hashes the first nbytes of a file (blake2b, 1 MiB reads). Returns None
+    unless they end on a newline, since a tail can only be parsed from a row
+    boundary.
+    """
+    digest, last = hashlib.blake2b(digest_size=16), b''
+    with open(filepath, 'rb') as f:
+        while nbytes > 0:
+            block = f.read(min(DIGEST_BLOCK, nbytes))
+            if not block:
+                break
+            digest.update(block)
+            last = block[-1:]
+            nbytes -= len(block)
+    return digest.hexdigest() if last == b'\n' else None
+
+def load_storage_history(filepath):
+    """
+    Loads the history through a parquet sidecar next to the CSV.
+    The sidecar remembers the CSV size/mtime/header it was built from plus a
+    digest of its bytes. A grown CSV whose first cached_size bytes still hash
+    the same only needs its new tail parsed; anything else (e.g. a rewrite by
+    merge_storage_logs.py) is parsed from scratch.
+    """
+    if pq is None or not os.path.exists(filepath):
+        return load_robust_csv(filepath)
+
+    sidecar = os.path.splitext(filepath)[0] + ".parquet"
+    stat = os.stat(filepath)
+    with open(filepath, 'rb') as f:
+        header = f.readline().decode(errors='replace')
+    key = {"size": stat.st_size, "mtime": stat.st_mtime, "header": header}
+
+    cached, cached_key = None, None
+    if os.path.exists(sidecar):
+        try:
+            table = pq.read_table(sidecar)
+            cached_key = json.loads(table.schema.metadata[CACHE_META_KEY])
+            cached = table.to_pandas()
+        except (OSError, KeyError, TypeError, ValueError) as e:
+            print(f"⚠️ Ignoring unreadable cache {sidecar}: {e}")
+
+    if cached is not None and all(cached_key.get(k) == key[k] for k in ("size", "mtime", "header")):
+        return cached
+    df = None
+    if (cached is not None and cached_key["header"] == header and stat.st_size > cached_key["size"]
+            and cached_key.get("digest") is not None
+            and cached_key["digest"] == prefix_digest(filepath, cached_key["size"])):
+        tail = load_robust_csv(filepath, offset=cached_key["size"])
+        if tail.empty or has_parsed_timestamps(tail['timestamp']):
+            df = concat_history([cached, tail])
+    if df is None:
+        df = load_robust_csv(filepath)
+
+    # Only fully typed frames are cached; text timestamps mean the Arrow read failed
+    if not df.empty and has_parsed_timestamps(df['timestamp']):
+        try:
+            key["digest"] = prefix_digest(filepath, stat.st_size)
+            table = pyarrow.Table.from_pandas(df, preserve_index=False)
+            metadata = {**(table.schema.metadata or {}), CACHE_META_KEY: json.dumps(key).encode()}
+            pq.write_table(table.replace_schema_metadata(metadata), sidecar,
+                           compression='zstd', compression_level=1)
+        except OSError as e:
+            print(f"⚠️ Could not write cache {sidecar}: {e}")
+    return df
 
 def main():
     # 1. Setup Output
@@ -63,7 +220,7 @@ def main():
     data_file = sys.argv[1] if len(sys.argv) > 1 else DATA_FILE_PATH
     
     print(f"🔍 Loading data from {data_file}...")
-    df = load_robust_csv(data_file)
+    df = load_storage_history(data_file)
     
     if df.empty:
         print("⚠️ No data found or file is empty.")
@@ -71,8 +228,15 @@ def main():
 
     # 3. Preprocess
     try:
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
-        df['disk_used_gb'] = df['disk_used_kb'] / (1024 * 1024)
+        # Collector writes datetime.isoformat(); the ISO8601 path skips per-value
+        # format inference. utc=True keeps DST offset changes in one dtype.
+        # Arrow reads and the sidecar arrive typed; only the C engine fallback
+        # still hands us strings here.
+        if not has_parsed_timestamps(df['timestamp']):
+            try:
+                df['timestamp'] = pd.to_datetime(df['timestamp'], format='ISO8601', utc=True, cache=True)
+            except ValueError:
+                df['timestamp'] = pd.to_datetime(df['timestamp'], format='mixed', utc=True, cache=True)
     except Exception as e:
         print(f"❌ Error processing data types: {e}")
         return
@@ -80,24 +244,41 @@ def main():
     # 4. Plot by Node
     plt.figure(figsize=(12, 6))
     
-    nodes = df['node_name'].unique()
-    for node in nodes:
-        node_data = df[df['node_name'] == node].sort_values('timestamp')
-        
-        if len(node_data) == 0:
+    # Sort and split on plain ndarrays: lexsort orders rows by node code then
+    # time, and np.unique on the sorted codes gives each node's row range.
+    times = df['timestamp'].to_numpy(dtype='datetime64[ns]')
+    codes = df['node_name'].cat.codes.to_numpy()
+    order = np.lexsort((times, codes))
+    times, codes = times[order], codes[order]
+    disk_kb = df['disk_used_kb'].to_numpy()[order]
+    node_codes, starts = np.unique(codes, return_index=True)
+    stops = np.append(starts[1:], len(codes))
+    categories = df['node_name'].cat.categories
+
+    # Per-node slices are views of the contiguous permuted buffers above
+    for code, start, stop in zip(node_codes, starts, stops):
+        if code < 0:  # rows without a node name
             continue
+        node = categories[code]
+        node_times = times[start:stop]
+        # Rows are already time-ordered by the global lexsort; no per-node resort
+        if DEBUG_CHECKS:
+            assert (node_times[1:] >= node_times[:-1]).all(), f"{node}: timestamps not monotonic"
+        # Converted per node on the raw buffer; no extra full-length GB column
+        disk_gb = disk_kb[start:stop] * KB_TO_GB
 
-        plt.plot(node_data['timestamp'], node_data['disk_used_gb'], 
-                 marker='o', linestyle='-', label=f"{node} Used")
+        line, = plt.plot(node_times, disk_gb, linestyle='-', label=f"{node} Used", rasterized=True)
+        # Cap markers at ~MAX_MARKERS per node so long histories don't explode the path count
+        step = max(1, node_times.size // MAX_MARKERS)
+        plt.plot(node_times[::step], disk_gb[::step], 'o', ms=3, color=line.get_color())
         
         # Simple Forecast (Linear Projection based on last 2 points)
-        if len(node_data) > 1:
-            last_two = node_data.iloc[-2:]
-            growth_gb = last_two['disk_used_gb'].iloc[-1] - last_two['disk_used_gb'].iloc[0]
-            time_diff_h = (last_two['timestamp'].iloc[-1] - last_two['timestamp'].iloc[0]).total_seconds() / 3600
+        if node_times.size > 1:
+            growth_gb = disk_gb[-1] - disk_gb[-2]
+            time_diff_h = (node_times[-1] - node_times[-2]) / np.timedelta64(1, 'h')
             
             if time_diff_h > 0.01: # Avoid division by zero
-                rate = growth_gb / time_diff_h
+                rate = float(growth_gb) / time_diff_h
                 print(f"📈 {node} Growth Rate: {rate:.2f} GB/hour")
             else:
                  print(f"ℹ️ {node}: Not enough time separation for rate calc.")
@@ -113,7 +294,7 @@ def main():
     # 5. Save
     timestamp_str = datetime.now().strftime("%Y%m%d_%H%M%S")
     out_path = os.path.join(OUTPUT_DIR, f"storage_report_{timestamp_str}.png")
-    plt.savefig(out_path)
+    plt.savefig(out_path, dpi=100)
     print(f"✅ Plot saved to: {out_path}")
 
 if __name__ == "__main__":
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# Path: analysis/archive/plots/test_plot_storage.py
+# Description: Checks that plot_storage.py reuses its parquet sidecar.
+#              Run: python -m unittest analysis/archive/plots/test_plot_storage.py
+
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import plot_storage
+
+HEADER = "timestamp,node_name,disk_used_kb,recording_size_kb\n"
+ROWS = [
+    "2026-01-01T00:00:00+00:00,sensor-north,1000000,10\n",
+    "2026-01-01T01:00:00+00:00,sensor-north,1100000,10\n",
+]
+
+@unittest.skipIf(plot_storage.pq is None, "pyarrow not installed")
+class SidecarCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.csv = os.path.join(self.tmp.name, "storage_history.csv")
+        self.sidecar = os.path.join(self.tmp.name, "storage_history.parquet")
+        with open(self.csv, "w") as f:
+            f.write(HEADER + "".join(ROWS))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_second_run_loads_from_sidecar(self):
+        first = plot_storage.load_storage_history(self.csv)
+        self.assertTrue(os.path.exists(self.sidecar))
+        with mock.patch.object(plot_storage, "load_robust_csv", side_effect=AssertionError("CSV re-parsed")):
+            second = plot_storage.load_storage_history(self.csv)
+        self.assertEqual(len(second), len(first))
+        self.assertTrue(plot_storage.has_parsed_timestamps(second['timestamp']))
+
+    def test_appended_rows_parse_only_the_tail(self):
+        plot_storage.load_storage_history(self.csv)
+        size = os.path.getsize(self.csv)
+        with open(self.csv, "a") as f:
+            f.write("2026-01-01T02:00:00+00:00,sensor-north,1200000,10\n")
+        real = plot_storage.load_robust_csv
+        with mock.patch.object(plot_storage, "load_robust_csv", side_effect=real) as reader:
+            df = plot_storage.load_storage_history(self.csv)
+        reader.assert_called_once_with(self.csv, offset=size)
+        self.assertEqual(len(df), 3)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,6 @@
 import sys
 import os
+import csv
 import time
 import socket
 import json
@@ -7,7 +8,10 @@ import threading
 import logging
 import argparse
 import datetime
-import urllib.request
+import signal
+import atexit
+import http.client
+import collections
 from logging.handlers import RotatingFileHandler
 
 # ==============================================================================
@@ -19,6 +23,15 @@ from logging.handlers import RotatingFileHandler
 LOG_FORMAT = '%(asctime)s %(levelname)s: %(message)s'
 STATS_INTERVAL = 60      # System health check (seconds)
 AIRCRAFT_INTERVAL = 1.0  # Trajectory snapshot rate (seconds)
+STATS_FLUSH_TICKS = 10   # Stats rows are buffered and appended every N ticks (SD card wear)
+STATS_HEADERS = ["timestamp", "messages_total", "aircraft_tracked", "cpu_temp"]
+AIRCRAFT_HEADERS = ["timestamp", "hex", "flight", "lat", "lon", "alt", "gs", "track", "rssi"]
+WRITE_BUFFER = 64 * 1024 # Userspace buffer per open log; flushed every stats tick
+RECV_BUFFER = 64 * 1024  # Reused receive buffer for the raw frame stream
+WRITE_QUEUE_POLLS = 300  # Aircraft snapshots held for the writer thread; oldest dropped beyond this
+LINE_PORTS = (30002, 30003)  # AVR raw / SBS: one frame per line; anything else is Beast
+HEALTH_FILE = "/var/lib/adsb_storage/health_status.json"
+THERMAL_FILE = "/sys/class/thermal/thermal_zone0/temp"
 
 # Setup Global Logging
 sys_log = logging.getLogger("SmartADSBLogger")
@@ -27,6 +40,25 @@ handler = logging.StreamHandler(sys.stdout)
 handler.setFormatter(logging.Formatter(LOG_FORMAT))
 sys_log.addHandler(handler)
 
+def count_beast_frames(buf, n, odd_run):
+    """
+    Counts Beast frame starts in buf[:n]. Frames start with 0x1a and a literal 0x1a
+    inside a frame is sent doubled, so a run of 0x1a bytes is escaped pairs plus at
+    most one frame start: it counts as its length mod 2. odd_run says the previous
+    recv ended in a run of odd length; a run split across two recvs is corrected
+    with it. Returns (frames, odd_run for the next recv).
+    """
+    frames = buf.count(b"\x1a", 0, n) - 2 * buf.count(b"\x1a\x1a", 0, n)
+    lead = 0
+    while lead < n and buf[lead] == 0x1a: lead += 1
+    if odd_run and lead % 2:
+        frames -= 2  # both halves counted the split run as odd; together it is even
+    if lead == n:
+        return frames, odd_run != bool(n % 2)
+    tail = 0
+    while buf[n - 1 - tail] == 0x1a: tail += 1
+    return frames, bool(tail % 2)
+
 class SmartLogger:
     def __init__(self, host, port, log_dir, log_aircraft):
         self.host = host
@@ -44,44 +76,139 @@ class SmartLogger:
         self.messages_total = 0
         self.aircraft_seen = 0
 
-    def get_filenames(self):
-        today = datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%d")
-        return {
-            "stats": os.path.join(self.log_dir, f"{self.sensor_id}_stats_log_{today}.csv"),
-            "aircraft": os.path.join(self.log_dir, f"{self.sensor_id}_aircraft_log_{today}.csv")
-        }
+        # Pending stats rows and the daily file they belong to
+        self._stats_rows = []
+        self._stats_path = None
+
+        # Open log handles: file_type -> (path, file, csv writer). Reopened on UTC day roll.
+        self._handles = {}
+        # (UTC date, paths) of the current day; rebuilt only when the date rolls
+        self._day_paths = (None, None)
+        atexit.register(self.close_all)
+
+        # Aircraft snapshots waiting for the writer thread: (filepath, rows) per poll
+        self._pending = collections.deque(maxlen=WRITE_QUEUE_POLLS)
+        self._pending_lock = threading.Lock()
+        self._pending_event = threading.Event()
+        self._dropped_rows = 0
+
+    def get_filenames(self, now=None):
+        day = (now or datetime.datetime.now(datetime.timezone.utc)).date()
+        cached_day, paths = self._day_paths
+        if day != cached_day:
+            today = day.strftime("%Y-%m-%d")
+            paths = {
+                "stats": os.path.join(self.log_dir, f"{self.sensor_id}_stats_log_{today}.csv"),
+                "aircraft": os.path.join(self.log_dir, f"{self.sensor_id}_aircraft_log_{today}.csv")
+            }
+            # One tuple assignment, so the other thread never sees a mismatched pair
+            self._day_paths = (day, paths)
+        return paths
 
-    def write_csv(self, file_type, headers, data):
-        filepath = self.get_filenames()[file_type]
-        file_exists = os.path.isfile(filepath)
+    def _get_writer(self, file_type, headers, filepath):
+        """Returns the csv writer for filepath, rotating the handle when the path changes. Call under self.lock."""
+        path, f, writer = self._handles.get(file_type, (None, None, None))
+        if path != filepath:
+            if f: f.close()
+            file_exists = os.path.isfile(filepath)
+            f = open(filepath, "a", buffering=WRITE_BUFFER, newline="")
+            # C writer bound once per handle; quotes odd callsigns instead of splitting the row
+            writer = csv.writer(f, lineterminator="\n")
+            if not file_exists:
+                writer.writerow(headers)
+            self._handles[file_type] = (filepath, f, writer)
+        return writer
+
+    def write_csv(self, file_type, headers, rows, filepath=None):
+        """Appends rows to today's log (or filepath) through its long-lived handle."""
+        filepath = filepath or self.get_filenames()[file_type]
         
         with self.lock:
             try:
-                with open(filepath, "a") as f:
-                    if not file_exists:
-                        f.write(",".join(headers) + "\n")
-                    f.write(",".join(map(str, data)) + "\n")
+                self._get_writer(file_type, headers, filepath).writerows(rows)
             except Exception as e:
                 sys_log.error(f"Failed to write {file_type} log: {e}")
 
+    def flush_files(self):
+        """Pushes buffered log lines to the kernel."""
+        with self.lock:
+            for path, f, _ in self._handles.values():
+                try: f.flush()
+                except Exception as e: sys_log.error(f"Failed to flush {path}: {e}")
+
+    def close_all(self):
+        """Flushes and closes every open log (atexit / shutdown)."""
+        with self.lock:
+            for path, f, _ in self._handles.values():
+                try: f.close()
+                except Exception as e: sys_log.error(f"Failed to close {path}: {e}")
+            self._handles = {}
+
+    def flush_stats(self):
+        """Writes buffered stats rows to the file they were sampled for."""
+        rows, self._stats_rows = self._stats_rows, []
+        if rows:
+            self.write_csv("stats", STATS_HEADERS, rows, filepath=self._stats_path)
+
+    def queue_aircraft(self, filepath, rows):
+        """Hands one poll's rows to the writer thread; never blocks on the disk."""
+        with self._pending_lock:
+            if len(self._pending) == self._pending.maxlen:
+                self._dropped_rows += len(self._pending[0][1])
+            self._pending.append((filepath, rows))
+        self._pending_event.set()
+
+    def drain_aircraft(self):
+        """Writes every queued snapshot, reporting overflow losses once per drain."""
+        with self._pending_lock:
+            batches = list(self._pending)
+            self._pending.clear()
+            dropped, self._dropped_rows = self._dropped_rows, 0
+        if dropped:
+            sys_log.warning(f"Aircraft writer fell behind: dropped {dropped} rows")
+        for filepath, rows in batches:
+            self.write_csv("aircraft", AIRCRAFT_HEADERS, rows, filepath=filepath)
+
+    def shutdown(self, signum, frame):
+        """SIGTERM (systemd stop): keep buffered stats, then exit."""
+        sys_log.info("Stopping (SIGTERM)...")
+        self.running = False
+        self.flush_stats()
+        self.drain_aircraft()
+        self.close_all()
+        sys.exit(0)
+
     def run_stats_loop(self):
         """Logs system health every 60s."""
         sys_log.info(f"✅ Started Stats Monitor ({STATS_INTERVAL}s)")
+        # Opened once and re-read from offset 0 each tick
+        try:
+            thermal = open(THERMAL_FILE, "r")
+        except OSError:
+            thermal = None
         while self.running:
             try:
                 # Read CPU Temp
                 temp = "N/A"
                 try:
-                    with open("/sys/class/thermal/thermal_zone0/temp", "r") as f:
-                        temp = float(f.read()) / 1000.0
+                    thermal.seek(0)
+                    temp = float(thermal.read()) / 1000.0
                 except:
                     pass
                 
-                # Write Stats CSV
-                timestamp = datetime.datetime.now(datetime.timezone.utc).isoformat()
-                self.write_csv("stats", 
-                             ["timestamp", "messages_total", "aircraft_tracked", "cpu_temp"], 
-                             [timestamp, self.messages_total, self.aircraft_seen, temp])
+                # Buffer the stats row; the CSV is appended every STATS_FLUSH_TICKS
+                # ticks, on UTC day roll and on SIGTERM
+                now = datetime.datetime.now(datetime.timezone.utc)
+                timestamp = now.isoformat()
+                filepath = self.get_filenames(now)["stats"]
+                if filepath != self._stats_path:
+                    self.flush_stats()
+                    self._stats_path = filepath
+                self._stats_rows.append([timestamp, self.messages_total, self.aircraft_seen, temp])
+                if len(self._stats_rows) >= STATS_FLUSH_TICKS:
+                    self.flush_stats()
+                # Bounds what a crash can lose to one tick of aircraft rows
+                self.flush_files()
                 
                 # Update Health Status JSON (For external monitoring)
                 status = {
@@ -89,8 +216,13 @@ class SmartLogger:
                     "timestamp": timestamp,
                     "metrics": {"messages": self.messages_total, "temp": temp}
                 }
-                with open("/var/lib/adsb_storage/health_status.json", "w") as f:
-                    json.dump(status, f)
+                # dumps() takes the C encoder in one shot; dump() streams through the
+                # pure-Python iterencode path with a write per fragment.
+                # Written aside and renamed over, so readers never see a truncated file.
+                tmp_file = HEALTH_FILE + ".tmp"
+                with open(tmp_file, "w") as f:
+                    f.write(json.dumps(status))
+                os.replace(tmp_file, HEALTH_FILE)
                     
             except Exception as e:
                 sys_log.error(f"Stats loop error: {e}")
@@ -103,63 +235,90 @@ class SmartLogger:
             return
 
         sys_log.info(f"✅ Started Aircraft Logger ({AIRCRAFT_INTERVAL}s)")
-        # We assume readsb/dump1090 is running on localhost port 8080
-        url = "http://localhost:8080/data/aircraft.json"
+        # We assume readsb/dump1090 is running on localhost port 8080.
+        # One keep-alive connection is reused across polls; http.client
+        # reconnects by itself on the next request after a close().
+        conn = http.client.HTTPConnection("localhost", 8080, timeout=2)
         
         while self.running:
             try:
-                with urllib.request.urlopen(url, timeout=2) as response:
-                    data = json.loads(response.read().decode())
+                conn.request("GET", "/data/aircraft.json")
+                response = conn.getresponse()
+                body = response.read()
+                if response.status != 200:
+                    raise http.client.HTTPException(f"HTTP {response.status}")
+                # json.loads takes the UTF-8 bytes as-is; no intermediate str copy
+                data = json.loads(body)
                     
-                timestamp = datetime.datetime.now(datetime.timezone.utc).isoformat()
-                self.aircraft_seen = len(data.get("aircraft", []))
+                # One clock read per poll stamps every row and picks the day's file
+                now = datetime.datetime.now(datetime.timezone.utc)
+                timestamp = now.isoformat()
+                aircraft = data.get("aircraft", [])
+                self.aircraft_seen = len(aircraft)
                 
-                for ac in data.get("aircraft", []):
-                    # Only log if we have at least a Hex ID
-                    if "hex" in ac:
-                        row = [
-                            timestamp,
-                            ac.get("hex", ""),
-                            ac.get("flight", "").strip(),
-                            ac.get("lat", ""),
-                            ac.get("lon", ""),
-                            ac.get("alt_baro", ""),
-                            ac.get("gs", ""),
-                            ac.get("track", ""),
-                            ac.get("rssi", "")
-                        ]
-                        self.write_csv("aircraft", 
-                                     ["timestamp", "hex", "flight", "lat", "lon", "alt", "gs", "track", "rssi"], 
-                                     row)
+                # One batch per poll: a single lock/write for the whole snapshot.
+                # Only log if we have at least a Hex ID. Plain tuples; the C writer stringifies them.
+                rows = [(
+                    timestamp,
+                    ac.get("hex", ""),
+                    ac.get("flight", "").strip(),
+                    ac.get("lat", ""),
+                    ac.get("lon", ""),
+                    ac.get("alt_baro", ""),
+                    ac.get("gs", ""),
+                    ac.get("track", ""),
+                    ac.get("rssi", "")
+                ) for ac in aircraft if "hex" in ac]
+                if rows:
+                    self.queue_aircraft(self.get_filenames(now)["aircraft"], rows)
                                      
             except Exception as e:
                 # Don't spam logs if service is momentarily down
-                pass
+                conn.close()
                 
             time.sleep(AIRCRAFT_INTERVAL)
 
+    def run_writer_loop(self):
+        """Appends queued aircraft snapshots, so a slow disk never stalls the poller."""
+        while self.running:
+            self._pending_event.wait(timeout=AIRCRAFT_INTERVAL)
+            self._pending_event.clear()
+            self.drain_aircraft()
+
     def run(self):
         sys_log.info(f"🚀 Initializing...")
+        signal.signal(signal.SIGTERM, self.shutdown)
         
         # 1. Start Stats Thread
         threading.Thread(target=self.run_stats_loop, daemon=True).start()
         
         # 2. Start Aircraft Logging Thread
         threading.Thread(target=self.run_aircraft_loop, daemon=True).start()
+        if self.log_aircraft:
+            threading.Thread(target=self.run_writer_loop, daemon=True).start()
         
         # 3. Main Loop: Keep a heartbeat connection to port 30005 (just to count raw frames)
+        # Received bytes are only counted, so one buffer is reused for every recv
+        rx_buf = bytearray(RECV_BUFFER)
+        rx_view = memoryview(rx_buf)
+        line_format = self.port in LINE_PORTS
         while self.running:
             try:
                 s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
                 s.settimeout(10)
                 s.connect((self.host, self.port))
                 sys_log.info(f"✅ Connected to ADSB Stream ({self.port})")
+                odd_run = False  # a new connection starts on a frame boundary
                 
                 while self.running:
-                    data = s.recv(4096)
-                    if not data: break
-                    # Just count raw frames for health stats
-                    self.messages_total += 1
+                    n = s.recv_into(rx_view)
+                    if not n: break
+                    # Count frames, not recv() calls
+                    if line_format:
+                        self.messages_total += rx_buf.count(b"\n", 0, n)
+                    else:
+                        frames, odd_run = count_beast_frames(rx_buf, n, odd_run)
+                        self.messages_total += frames
             except Exception as e:
                 time.sleep(5)
             finally:
@@ -178,3 +337,5 @@ if __name__ == "__main__":
         sensor_app.run()
     except KeyboardInterrupt:
         sys_log.info("Stopping...")
+        sensor_app.flush_stats()
+        sensor_app.drain_aircraft()
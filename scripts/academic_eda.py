@@ -9,13 +9,49 @@ import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
 import seaborn as sns
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.colors import to_rgb
+from matplotlib.patches import Patch
 import argparse
+import gzip
+import io
+import os
 import subprocess
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
 from datetime import datetime, timedelta, timezone
 
+# Arrow's multi-threaded CSV reader when available; the C parser otherwise.
+# Aircraft logs stay Arrow tables until one conversion after the concat.
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pacsv
+    import pyarrow.parquet as pq
+    CSV_ENGINE = {'engine': 'pyarrow'}
+except ImportError:
+    pa = pc = pacsv = pq = None
+    CSV_ENGINE = {'low_memory': False}
+
 # --- CONFIGURATION ---
 BASE_DIR = Path("infra/ansible/playbooks/research_data/raw")
+COLUMN_RENAMES = {'alt_baro': 'alt', 'gs': 'ground_speed'}
+TEXT_COLUMNS = ['timestamp', 'hex', 'flight', 'squawk']
+# Raw log columns the EDA reads; flight/squawk and the integrity fields are never parsed.
+# Loggers write either alt_baro or alt, so both names are listed.
+LOG_COLUMNS = ['timestamp', 'hex', 'lat', 'lon', 'alt_baro', 'alt', 'gs', 'track', 'rssi']
+# Readers put text such as 'ground' in the altitude field, so every column is read as text and
+# the numeric ones are cast per file: every table then shares one schema for the concat.
+NUMERIC_TEXT = r'^[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?$'
+DTYPE_SCHEMA = {'hex': str, 'flight': str, 'squawk': str, 'sensor_id': str}
+# Parsed logs are kept as parquet; a cache newer than its CSV skips tokenizing on re-runs.
+# Bump the version when _read_log_arrow's output schema changes.
+EDA_CACHE_DIR = Path("research_data/eda_cache")
+EDA_CACHE_VERSION = "v3"
+# Read size for .gz logs: decompression is fed 1 MiB at a time (gzip's own reads are 8 KiB before 3.12)
+GZIP_BUFFER = 1 << 20
 ML_DATASET = Path("research_data/ml_ready/training_dataset_v4_ensemble.csv")
 
 SENSORS = {
@@ -23,6 +59,81 @@ SENSORS = {
     "sensor-east":  {"lat": 60.3621, "lon": 25.3375, "color": "#bc5090", "name": "East (Sipoo)", "marker": "s"}, 
     "sensor-west":  {"lat": 60.1478, "lon": 24.5264, "color": "#ffa600", "name": "West (Jorvas)", "marker": "o"} 
 }
+# Sensor positions as (lat rad, lon rad, cos lat) for haversine; fixed, so computed once
+SENSOR_RADIANS = {k: (np.radians(v['lat']), np.radians(v['lon']), np.cos(np.radians(v['lat']))) for k, v in SENSORS.items()}
+
+def _read_log_arrow(f, sid):
+    """One aircraft log as an Arrow table; bad rows skipped, columns renamed, sensor_id attached."""
+    cache = EDA_CACHE_DIR / f"{sid}_{f.name}.{EDA_CACHE_VERSION}.parquet"
+    table = None
+    if cache.exists() and cache.stat().st_mtime >= f.stat().st_mtime:
+        try: table = pq.read_table(cache)
+        except Exception as e: print(f"   ⚠️  Ignoring unreadable cache {cache.name}: {e}")
+
+    if table is None:
+        # input_stream picks the codec from the extension and buffers the raw reads
+        with pa.input_stream(str(f), buffer_size=GZIP_BUFFER) as src:
+            table = pacsv.read_csv(src, parse_options=pacsv.ParseOptions(invalid_row_handler=lambda row: 'skip'),
+                                   convert_options=pacsv.ConvertOptions(column_types={c: pa.string() for c in LOG_COLUMNS},
+                                                                        include_columns=LOG_COLUMNS, include_missing_columns=True))
+        # Columns this file does not have come back all-null; drop them so the alt/alt_baro aliases never collide
+        if table.num_rows:
+            table = table.drop_columns([c for c in table.column_names if table.column(c).null_count == table.num_rows])
+        table = table.rename_columns([COLUMN_RENAMES.get(c, c) for c in table.column_names])
+        if 'sensor_id' in table.column_names: table = table.drop_columns(['sensor_id'])
+        # Non-numeric text becomes null (to_numeric(errors='coerce') semantics)
+        for i, c in enumerate(table.column_names):
+            if c not in TEXT_COLUMNS:
+                col = table.column(i)
+                num = pc.if_else(pc.match_substring_regex(col, NUMERIC_TEXT), col, pa.scalar(None, pa.string()))
+                table = table.set_column(i, c, pc.cast(num, pa.float64()))
+        # Written aside and swapped in, so an interrupted run never leaves a fresh-looking partial file
+        tmp_cache = cache.with_name(cache.name + ".tmp")
+        try:
+            EDA_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            pq.write_table(table, tmp_cache, compression='zstd')
+            os.replace(tmp_cache, cache)
+        except (OSError, pa.ArrowException) as e:
+            print(f"   ⚠️  Could not cache {f.name}: {e}")
+
+    sensor = pa.DictionaryArray.from_arrays(np.zeros(table.num_rows, dtype=np.int32), pa.array([sid]))
+    return table.append_column('sensor_id', sensor)
+
+def _read_one(f, cutoff=None):
+    """Reads one aircraft log with sensor_id attached and timestamps parsed, keeping rows at or after cutoff.
+    Returns (table or frame, rows before the trim, first, last timestamp); None if unreadable. Runs in a pool worker."""
+    try:
+        sid = "unknown"
+        for part in f.parts:
+            if part.startswith("sensor-"): sid = part; break
+
+        if pacsv is not None:
+            data = _read_log_arrow(f, sid)
+            raw_ts = data.column('timestamp').to_pandas()
+        else:
+            src = io.BufferedReader(gzip.open(f, 'rb'), buffer_size=GZIP_BUFFER) if f.name.endswith('.gz') else f
+            try:
+                data = pd.read_csv(src, on_bad_lines='skip', dtype=DTYPE_SCHEMA,
+                                   usecols=lambda c: c in LOG_COLUMNS, **CSV_ENGINE)
+            finally:
+                if src is not f: src.close()
+            data = data.rename(columns=COLUMN_RENAMES)
+            data['sensor_id'] = sid
+            raw_ts = data['timestamp']
+
+        # History totals are taken before the window trim; the report needs both
+        ts = pd.to_datetime(raw_ts, format='mixed', utc=True, errors='coerce')
+        span = (len(ts), ts.min(), ts.max())
+        keep = None if cutoff is None else ts.values >= cutoff
+        if pacsv is not None:
+            data = data.set_column(data.column_names.index('timestamp'), 'timestamp', pa.array(ts))
+            if keep is not None: data = data.filter(pa.array(keep))
+        else:
+            data['timestamp'] = ts
+            if keep is not None: data = data[keep]
+        return (data,) + span
+    except Exception:
+        return None
 
 class ADSB_Science_EDA:
     def __init__(self, output_dir, window_hours="24"):
@@ -37,148 +148,206 @@ class ADSB_Science_EDA:
         self.total_history_count = 0
         self.global_start = "N/A"
         self.global_end = "N/A"
+        self.window_bounds = (None, None)
         self.metadata = self._get_git_metadata()
         plt.style.use('seaborn-v0_8-paper')
-        plt.rcParams.update({'figure.dpi': 150, 'savefig.dpi': 300, 'font.family': 'sans-serif'})
+        # PNGs are saved at the figure dpi; Agg simplifies and chunks long line paths
+        plt.rcParams.update({'figure.dpi': 150, 'savefig.dpi': 'figure', 'font.family': 'sans-serif',
+                             'path.simplify_threshold': 1.0, 'agg.path.chunksize': 10000})
 
     def _get_git_metadata(self):
         try: return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD']).strip().decode()
         except: return "LOCAL"
 
-    def haversine(self, lat1, lon1, lat2, lon2):
+    def haversine(self, lat0, lon0, cos_lat0, lat, lon):
+        """km from sensor positions (radians, cos(lat0) precomputed) to lat/lon in degrees."""
         R = 6372.8 
-        dLat, dLon = np.radians(lat2 - lat1), np.radians(lon2 - lon1)
-        lat1, lat2 = np.radians(lat1), np.radians(lat2)
-        a = np.sin(dLat/2)**2 + np.cos(lat1)*np.cos(lat2)*np.sin(dLon/2)**2
-        return R * 2 * np.arcsin(np.sqrt(a))
+        # Two fresh buffers from radians(); every later step runs in place on them
+        lat, lon = np.radians(lat), np.radians(lon)
+        a = lat - lat0; a *= 0.5; np.sin(a, out=a); a *= a
+        lon -= lon0; lon *= 0.5; np.sin(lon, out=lon); lon *= lon
+        np.cos(lat, out=lat); lat *= cos_lat0; lat *= lon; a += lat
+        return R * 2 * np.arcsin(np.sqrt(a, out=a), out=a)
     
-    def add_timestamp(self, ax=None):
+    def new_figure(self, figsize, *grid):
+        # Batch output only: a bare Agg-backed Figure, never registered with pyplot's figure manager
+        fig = Figure(figsize=figsize)
+        FigureCanvasAgg(fig)
+        return fig, fig.subplots(*grid)
+
+    def density_layer(self, ax, x, y, extent, pal, bins=(400, 500)):
+        """Shades every window row into per-sensor count images (alpha = log count) instead of N markers."""
+        xmin, xmax, ymin, ymax = extent
+        for name, g in self.df_ac.groupby('sensor_id', observed=True)[[x, y]]:
+            gx, gy = g[x].to_numpy(), g[y].to_numpy()
+            ok = np.isfinite(gx) & np.isfinite(gy)
+            counts, _, _ = np.histogram2d(gy[ok], gx[ok], bins=bins, range=[[ymin, ymax], [xmin, xmax]])
+            if not counts.any(): continue
+            rgba = np.zeros(counts.shape + (4,))
+            rgba[..., :3] = to_rgb(pal.get(name, 'gray'))
+            rgba[..., 3] = np.where(counts > 0, 0.25 + 0.75 * np.log1p(counts) / np.log1p(counts.max()), 0)
+            ax.imshow(rgba, extent=extent, origin='lower', aspect='auto', interpolation='nearest')
+
+    def add_timestamp(self, fig, ax=None):
         t_str = datetime.now().strftime("Generated: %Y-%m-%d %H:%M")
         if ax: ax.text(0.99, 0.01, t_str, transform=ax.transAxes, ha='right', va='bottom', fontsize=8, color='gray', alpha=0.7)
-        else: plt.figtext(0.99, 0.01, t_str, ha='right', va='bottom', fontsize=8, color='gray', alpha=0.7)
+        else: fig.text(0.99, 0.01, t_str, ha='right', va='bottom', fontsize=8, color='gray', alpha=0.7)
 
     def load_science_data(self):
         print(f"[SCIENCE] 🔍 Loading historical data (Source: {BASE_DIR})...")
         ac_files = list(BASE_DIR.rglob("*aircraft_log*.csv*"))
-        ac_list = []
-        dtype_schema = {'hex': str, 'flight': str, 'squawk': str, 'sensor_id': str}
-        
-        for f in ac_files:
-            try:
-                sid = "unknown"
-                for part in f.parts:
-                    if part.startswith("sensor-"): sid = part; break
-                
-                comp = 'gzip' if f.name.endswith('.gz') else None
-                tmp = pd.read_csv(f, compression=comp, on_bad_lines='skip', dtype=dtype_schema, low_memory=False)
-                
-                if 'alt_baro' in tmp.columns: tmp.rename(columns={'alt_baro': 'alt'}, inplace=True)
-                if 'gs' in tmp.columns: tmp.rename(columns={'gs': 'ground_speed'}, inplace=True)
-                
-                if 'timestamp' in tmp.columns: 
-                    tmp['timestamp'] = pd.to_datetime(tmp['timestamp'], format='mixed', utc=True, errors='coerce')
-                
-                tmp['sensor_id'] = sid
-                if sid in SENSORS and 'lat' in tmp.columns and 'lon' in tmp.columns: 
-                     tmp['distance_km'] = self.haversine(SENSORS[sid]['lat'], SENSORS[sid]['lon'], tmp['lat'], tmp['lon'])
-                
-                ac_list.append(tmp)
-            except: pass
+        # Window rows are selected per file, so out-of-window rows never reach the concat.
+        # Compared on raw UTC datetime64 values; no Timestamp boxing on either side.
+        cutoff = None
+        if self.window_hours.lower() != "all":
+            cutoff = np.datetime64(datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(hours=int(self.window_hours)), 'ns')
+        parts = []
+        if ac_files:
+            # Files are independent: decompress and tokenize them on all cores. Arrow's reader and
+            # zlib release the GIL, so threads suffice and tables are not pickled back; the
+            # pandas fallback keeps worker processes.
+            pool = ThreadPoolExecutor if pacsv is not None else ProcessPoolExecutor
+            with pool(max_workers=min(len(ac_files), os.cpu_count() or 1)) as ex:
+                parts = [r for r in ex.map(partial(_read_one, cutoff=cutoff), ac_files) if r is not None]
 
-        if ac_list:
-            full_df = pd.concat(ac_list, ignore_index=True)
-            self.total_history_count = len(full_df)
+        if parts:
+            ac_list = [p[0] for p in parts]
+            if pacsv is not None:
+                # Files missing a column get nulls; one Arrow -> pandas conversion
+                self.df_ac = pa.concat_tables(ac_list, promote_options='permissive').to_pandas()
+            else:
+                self.df_ac = pd.concat(ac_list, ignore_index=True)
+            # Low-cardinality keys: groupby/unique below run on integer codes. Sensors with no
+            # rows in the window are dropped from the categories (seaborn hue/palette), and
+            # categories are sorted so tables keep their order whichever reader built them.
+            for c in ('hex', 'sensor_id'):
+                if c in self.df_ac.columns:
+                    col = self.df_ac[c].astype('category').cat.remove_unused_categories()
+                    self.df_ac[c] = col.cat.reorder_categories(sorted(col.cat.categories))
+            self.total_history_count = sum(p[1] for p in parts)
             
-            if not full_df.empty:
-                self.global_start = full_df['timestamp'].min().strftime('%Y-%m-%d %H:%M')
-                self.global_end = full_df['timestamp'].max().strftime('%Y-%m-%d %H:%M')
+            # History extremes come from the per-file spans and are reused by the report
+            ts_min = min((p[2] for p in parts if pd.notna(p[2])), default=pd.NaT)
+            ts_max = max((p[3] for p in parts if pd.notna(p[3])), default=pd.NaT)
+            if pd.notna(ts_min):
+                self.global_start = ts_min.strftime('%Y-%m-%d %H:%M')
+                self.global_end = ts_max.strftime('%Y-%m-%d %H:%M')
             
             print(f"   📚 Total Records Found: {self.total_history_count:,}")
             print(f"   ⏳ Data Span: {self.global_start} to {self.global_end}")
 
-            if self.window_hours.lower() != "all":
-                print(f"   ✂️  Filtering for last {self.window_hours} hours...")
-                cutoff = datetime.now(timezone.utc) - timedelta(hours=int(self.window_hours))
-                self.df_ac = full_df[full_df['timestamp'] >= cutoff].copy()
+            if cutoff is not None:
+                print(f"   ✂️  Filtered to the last {self.window_hours} hours.")
+                self.window_bounds = (self.df_ac['timestamp'].min(), self.df_ac['timestamp'].max())
             else:
-                self.df_ac = full_df.copy()
+                self.window_bounds = (ts_min, ts_max)
             
-            for c in ['rssi', 'alt', 'ground_speed', 'lat', 'lon']:
-                if c in self.df_ac.columns: self.df_ac[c] = pd.to_numeric(self.df_ac[c], errors='coerce')
+            # Kinematics/signal fit float32 (half the bytes through KDE/hist/box plots);
+            # lat/lon stay float64 since float32 only resolves ~1 m here
+            num = [c for c in ['rssi', 'alt', 'ground_speed', 'track', 'lat', 'lon'] if c in self.df_ac.columns]
+            self.df_ac[num] = self.df_ac[num].apply(pd.to_numeric, errors='coerce').astype(
+                {c: 'float64' if c in ('lat', 'lon') else 'float32' for c in num})
+
+            # Range to the receiving sensor, all sensors in one vectorised pass (NaN for unknown sensors).
+            # Sensor constants are gathered by category code; the trailing NaN row catches code -1.
+            if 'lat' in self.df_ac.columns and 'lon' in self.df_ac.columns:
+                sid = self.df_ac['sensor_id'].cat
+                lut = np.array([SENSOR_RADIANS.get(c, (np.nan,) * 3) for c in sid.categories] + [(np.nan,) * 3])
+                lat0, lon0, cos_lat0 = lut[sid.codes.to_numpy()].T
+                self.df_ac['distance_km'] = self.haversine(lat0, lon0, cos_lat0, self.df_ac['lat'].to_numpy(), self.df_ac['lon'].to_numpy()).astype('float32')
 
             print(f"   ✅ Analysis Window Loaded: {len(self.df_ac):,} rows.")
         else:
             print(f"   ⚠️  No aircraft logs found in {BASE_DIR}")
 
         if ML_DATASET.exists():
-            self.df_ml = pd.read_csv(ML_DATASET, dtype=dtype_schema, low_memory=False)
+            self.df_ml = pd.read_csv(ML_DATASET, dtype=DTYPE_SCHEMA, **CSV_ENGINE)
+            # Same narrowing as df_ac: float32 features, int8 labels/scores; lat/lon stay float64
+            for c in self.df_ml.select_dtypes('number').columns:
+                if c not in ('lat', 'lon'):
+                    kind = 'signed' if pd.api.types.is_integer_dtype(self.df_ml[c]) else 'float'
+                    self.df_ml[c] = pd.to_numeric(self.df_ml[c], downcast=kind)
             if 'ensemble_score' not in self.df_ml.columns:
                  if 'anomaly' in self.df_ml.columns:
-                     self.df_ml['ensemble_score'] = self.df_ml['anomaly'].apply(lambda x: 2 if x == -1 else 0)
+                     self.df_ml['ensemble_score'] = np.where(self.df_ml['anomaly'] == -1, 2, 0).astype('int8')
             print(f"   ✅ ML Dataset Loaded: {len(self.df_ml):,} rows")
 
     def generate_plots(self):
         if self.df_ac.empty: return
         print("[SCIENCE] 🎨 Generating Plots...")
         pal = {k: v['color'] for k,v in SENSORS.items() if k in self.df_ac['sensor_id'].unique()}
+        # 50k sample for the RSSI KDE (cost grows with N); everything else uses the full frame
+        sample = self.df_ac.sample(n=min(50_000, len(self.df_ac)), random_state=0)
         
-        fig, axs = plt.subplots(2, 2, figsize=(12, 8))
+        fig, axs = self.new_figure((12, 8), 2, 2)
         if not self.df_ac.empty:
-            sns.countplot(data=self.df_ac, x='sensor_id', hue='sensor_id', ax=axs[0,0], palette=pal, legend=False)
+            # Counts are one value_counts on the category codes; one bar artist per sensor
+            counts = self.df_ac['sensor_id'].value_counts(sort=False)
+            axs[0,0].bar(counts.index.astype(str), counts.to_numpy(), color=[sns.desaturate(pal.get(k, 'gray'), 0.75) for k in counts.index])
+            axs[0,0].set_xlabel('sensor_id'); axs[0,0].set_ylabel('count')
             if 'rssi' in self.df_ac.columns:
-                try: sns.kdeplot(data=self.df_ac, x='rssi', hue='sensor_id', fill=True, ax=axs[0,1], palette=pal, warn_singular=False)
+                try: sns.kdeplot(data=sample, x='rssi', hue='sensor_id', fill=True, ax=axs[0,1], palette=pal, warn_singular=False)
                 except: pass
             
-            self.df_ac['min'] = self.df_ac['timestamp'].dt.floor('min')
-            rate = self.df_ac.groupby(['min', 'sensor_id']).size().reset_index(name='count')
-            sns.lineplot(data=rate, x='min', y='count', hue='sensor_id', ax=axs[1,0], palette=pal)
+            # Per-minute rate binned by a time Grouper; no scratch 'min' column on df_ac
+            rate = self.df_ac.groupby(['sensor_id', pd.Grouper(key='timestamp', freq='1min')], observed=True).size().reset_index(name='count')
+            sns.lineplot(data=rate, x='timestamp', y='count', hue='sensor_id', ax=axs[1,0], palette=pal)
             axs[1,0].xaxis.set_major_formatter(mdates.DateFormatter('%m-%d\n%H:%M'))
             
             if 'distance_km' in self.df_ac.columns:
                 sns.boxplot(data=self.df_ac, x='sensor_id', y='distance_km', hue='sensor_id', ax=axs[1,1], palette=pal, legend=False)
         
-        self.add_timestamp()
-        plt.suptitle(f"D1: Operational Status (Last {self.window_hours}h)"); plt.tight_layout(); plt.savefig(self.fig_dir / "D1_Operational.png"); plt.close()
+        self.add_timestamp(fig)
+        fig.suptitle(f"D1: Operational Status (Last {self.window_hours}h)"); fig.tight_layout(); fig.savefig(self.fig_dir / "D1_Operational.png")
 
-        fig, ax = plt.subplots(figsize=(10, 8))
+        fig, ax = self.new_figure((10, 8))
+        s_lats = [meta['lat'] for meta in SENSORS.values()]
+        s_lons = [meta['lon'] for meta in SENSORS.values()]
+        extent = (min(s_lons) - 0.5, max(s_lons) + 0.5, min(s_lats) - 0.2, max(s_lats) + 0.2)
         if 'lat' in self.df_ac.columns and 'lon' in self.df_ac.columns:
-            sns.scatterplot(data=self.df_ac.sample(n=min(10000, len(self.df_ac))), x='lon', y='lat', hue='sensor_id', s=2, alpha=0.2, palette=pal, ax=ax, legend=False)
+            self.density_layer(ax, 'lon', 'lat', extent, pal)
+            ax.set_xlabel('lon'); ax.set_ylabel('lat')
             
-        s_lats, s_lons = [], []
         for sid, meta in SENSORS.items():
             ax.plot(meta['lon'], meta['lat'], marker=meta['marker'], markersize=15, color='black')
             ax.text(meta['lon'], meta['lat'] + 0.02, meta['name'].upper(), fontweight='bold', ha='center', bbox=dict(facecolor='white', alpha=0.8))
-            s_lats.append(meta['lat']); s_lons.append(meta['lon'])
+        ax.set_xlim(extent[0], extent[1])
+        ax.set_ylim(extent[2], extent[3])
         
-        if s_lats:
-            min_lat, max_lat = min(s_lats), max(s_lats)
-            min_lon, max_lon = min(s_lons), max(s_lons)
-            ax.set_xlim(min_lon - 0.5, max_lon + 0.5)
-            ax.set_ylim(min_lat - 0.2, max_lat + 0.2)
-        
-        self.add_timestamp(ax)
-        plt.title(f"D3: Spatial Coverage (Last {self.window_hours}h)"); plt.savefig(self.fig_dir / "D3_Spatial.png"); plt.close()
+        self.add_timestamp(fig, ax)
+        ax.set_title(f"D3: Spatial Coverage (Last {self.window_hours}h)"); fig.savefig(self.fig_dir / "D3_Spatial.png")
 
-        plt.figure(figsize=(10,6))
+        fig, ax = self.new_figure((10, 6))
         if 'ground_speed' in self.df_ac.columns and 'alt' in self.df_ac.columns:
-            sns.scatterplot(data=self.df_ac.sample(n=min(50000, len(self.df_ac))), x='ground_speed', y='alt', hue='sensor_id', palette=pal, s=10, alpha=0.3)
-        self.add_timestamp(); plt.title("D2: Physics"); plt.savefig(self.fig_dir / "D2_Physics.png"); plt.close()
+            gs, alt = self.df_ac['ground_speed'], self.df_ac['alt']
+            if gs.notna().any() and alt.notna().any():
+                self.density_layer(ax, 'ground_speed', 'alt', (gs.min(), gs.max(), alt.min(), alt.max()), pal)
+                ax.set_xlabel('ground_speed'); ax.set_ylabel('alt')
+                ax.legend(handles=[Patch(color=pal.get(k, 'gray'), label=k) for k in self.df_ac['sensor_id'].cat.categories], title='sensor_id')
+        self.add_timestamp(fig); ax.set_title("D2: Physics"); fig.savefig(self.fig_dir / "D2_Physics.png")
         
-        plt.figure(figsize=(10,6))
+        fig, ax = self.new_figure((10, 6))
         if 'rssi' in self.df_ac.columns:
-            sns.histplot(data=self.df_ac, x='rssi', hue='sensor_id', palette=pal, bins=30)
-        self.add_timestamp(); plt.title("D4: Forensics"); plt.savefig(self.fig_dir / "D4_Forensics.png"); plt.close()
+            # Binned in NumPy over the full window on shared edges; one stairs artist per sensor
+            rssi = self.df_ac['rssi'].to_numpy()
+            edges = np.histogram_bin_edges(rssi[~np.isnan(rssi)], bins=30)
+            for name, vals in self.df_ac.groupby('sensor_id', observed=True)['rssi']:
+                vals = vals.to_numpy()
+                hist, _ = np.histogram(vals[~np.isnan(vals)], bins=edges)
+                ax.stairs(hist, edges, fill=True, alpha=0.4, color=pal.get(name, 'gray'), label=name)
+            ax.set_xlabel('rssi'); ax.set_ylabel('Count'); ax.legend(title='sensor_id')
+        self.add_timestamp(fig); ax.set_title("D4: Forensics"); fig.savefig(self.fig_dir / "D4_Forensics.png")
 
         if not self.df_ml.empty and 'ensemble_score' in self.df_ml.columns:
-            fig, axs = plt.subplots(1, 3, figsize=(15, 5))
+            fig, axs = self.new_figure((15, 5), 1, 3)
             ml_viz = self.df_ml.copy()
             ml_viz['Class'] = ml_viz['ensemble_score'].apply(lambda x: 'Ghost' if x == 2 else ('Suspect' if x == 1 else 'Normal'))
             palette = {'Normal':'gray', 'Suspect':'orange', 'Ghost':'red'}
             for i, f in enumerate(['rssi', 'alt', 'ground_speed']):
                 if f in ml_viz.columns:
                     sns.boxplot(data=ml_viz, x='Class', y=f, hue='Class', ax=axs[i], palette=palette, legend=False)
-            self.add_timestamp()
-            plt.suptitle("D6: AI Forensics (Ensemble Clusters)"); plt.tight_layout(); plt.savefig(self.fig_dir / "D6_ML_Analysis.png"); plt.close()
+            self.add_timestamp(fig)
+            fig.suptitle("D6: AI Forensics (Ensemble Clusters)"); fig.tight_layout(); fig.savefig(self.fig_dir / "D6_ML_Analysis.png")
 
     def write_report(self):
         print("[SCIENCE] 📝 Compiling Full Academic Report...")
@@ -186,16 +355,17 @@ class ADSB_Science_EDA:
         
         start_t, end_t = "N/A", "N/A"
         if not self.df_ac.empty:
-            start_t = self.df_ac['timestamp'].min().strftime('%Y-%m-%d %H:%M')
-            end_t = self.df_ac['timestamp'].max().strftime('%H:%M UTC')
+            start_t = self.window_bounds[0].strftime('%Y-%m-%d %H:%M')
+            end_t = self.window_bounds[1].strftime('%H:%M UTC')
 
         t1 = pd.DataFrame()
         active_sensors = []
         if not self.df_ac.empty: 
-            t1 = self.df_ac.groupby('sensor_id').size().reset_index(name='Packets')
+            t1 = self.df_ac.groupby('sensor_id', observed=True).size().reset_index(name='Packets')
             active_sensors = t1['sensor_id'].unique()
 
-        with open(self.report_path, "w") as f:
+        # Build the report in memory; the file is written once at the end
+        with io.StringIO() as f:
             f.write(f"# 📡 ADS-B Grid Audit: {self.run_id}\n\n")
             f.write(f"**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M')}\n")
             f.write(f"**Analysis Window:** {self.window_hours} Hours ({start_t} to {end_t})\n\n")
@@ -302,6 +472,9 @@ class ADSB_Science_EDA:
             f.write("| `Clock_Arm_Hz` | Hz | Current CPU Frequency (Throttling check) |\n")
             f.write("| `disk_used_kb` | KB | Storage consumed by logs |\n")
 
+            with open(self.report_path, "w") as out:
+                out.write(f.getvalue())
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--out-dir", required=True, type=Path)
@@ -3,13 +3,17 @@ import json
 import subprocess
 import time
 import configparser
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 # ==============================================================================
-# Script: check_signal_health.py (v6.1)
+# Script: check_signal_health.py (v6.2)
 # Purpose: Robust Diagnostic Tool.
 #          - v6.1 FIX: Added "|| true" to SSH command to prevent Python crash 
 #            on GPS timeout. This restores Temp/Disk display for Sensor-North.
+#          - v6.2: Nodes are probed concurrently; each SSH probe can block
+#            ~2s on the gpspipe sample, so the dashboard no longer waits
+#            for them one after another.
 # ==============================================================================
 
 ANSIBLE_CFG = "infra/ansible/ansible.cfg"
@@ -105,12 +109,13 @@ def suggest_gain(peak):
     if peak < -30: return "ADVICE: Signal Weak. Increase Gain."
     return "PERFECT: Hold Gain."
 
-def print_dashboard(name, config):
+def probe_node(config):
+    """Runs the blocking SSH + HTTP probes for one node (worker thread)."""
+    return get_ssh_metrics(config['ip']), get_http_metrics(config['ip'], config['port'])
+
+def print_dashboard(name, config, sys, rf):
     print(f"\n📡 PROBING: {name.upper()} [{config['role']}]")
     
-    sys = get_ssh_metrics(config['ip'])
-    rf = get_http_metrics(config['ip'], config['port'])
-    
     # Defaults
     temp = disk = "N/A"
     gnss = "UNREACHABLE ❌"
@@ -154,10 +159,13 @@ def print_dashboard(name, config):
 
 def main():
     print("===============================================================")
-    print(f"      ADS-B DIAGNOSTICS v6.1 | {datetime.now().strftime('%H:%M:%S')}")
+    print(f"      ADS-B DIAGNOSTICS v6.2 | {datetime.now().strftime('%H:%M:%S')}")
     print("===============================================================")
+    with ThreadPoolExecutor(max_workers=len(NODES)) as pool:
+        probes = {name: pool.submit(probe_node, config) for name, config in NODES.items()}
+    # Rendered in NODES order once every probe has returned
     for name, config in NODES.items():
-        print_dashboard(name, config)
+        print_dashboard(name, config, *probes[name].result())
     print("")
 
 if __name__ == "__main__":
@@ -22,9 +22,20 @@ RAW_DIR = "infra/ansible/playbooks/research_data/raw"
 OUTPUT_DIR = "research_data/ml_ready"
 PLOTS_DIR = "output/plots/eda_v3"
 REPORT_FILE = f"{OUTPUT_DIR}/ml_audit.txt"
+# Normalized per-file frames are cached as parquet when pyarrow is available;
+# raw logs are immutable once rotated, so re-runs skip CSV parsing entirely.
+# The training set also gets a parquet copy next to the CSV.
+try:
+    import pyarrow
+    CACHE_DIR = f"{OUTPUT_DIR}/parquet_cache"
+    # Bump when load_and_normalize's output schema changes (v2: float32 kinematics)
+    CACHE_VERSION = "v2"
+except ImportError:
+    CACHE_DIR = None
 
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 os.makedirs(PLOTS_DIR, exist_ok=True)
+if CACHE_DIR: os.makedirs(CACHE_DIR, exist_ok=True)
 
 # Academic Aesthetics
 sns.set_theme(style="ticks", context="paper", font_scale=1.2)
@@ -47,6 +58,16 @@ def load_and_normalize(sensor_name, file_pattern, is_legacy_format=False):
     df_list = []
     for f in files:
         try:
+            # Cache hit: the parquet copy is newer than the raw log
+            cache_file = os.path.join(CACHE_DIR, f"{sensor_name}_{os.path.basename(f)}.{CACHE_VERSION}.parquet") if CACHE_DIR else None
+            if cache_file and os.path.exists(cache_file) and os.path.getmtime(cache_file) >= os.path.getmtime(f):
+                try:
+                    df_list.append(pd.read_parquet(cache_file))
+                    continue
+                except Exception as e:
+                    # Corrupt/truncated cache: fall through and re-parse the raw log
+                    log_msg(f"⚠️ Ignoring unreadable cache {os.path.basename(cache_file)}: {e}")
+
             # Pandas handles compression='infer' automatically for .gz
             temp_df = pd.read_csv(f, on_bad_lines='skip', low_memory=False)
             
@@ -66,16 +87,32 @@ def load_and_normalize(sensor_name, file_pattern, is_legacy_format=False):
                     temp_df['timestamp'] = temp_df['timestamp'].dt.tz_convert('UTC')
 
             # Type Enforcement
+            # Kinematics/signal fit float32 (half the bytes through scaler and
+            # models); lat/lon stay float64 since float32 only resolves ~1 m here
             for col in ['lat', 'lon', 'alt', 'ground_speed', 'track', 'rssi']:
                 if col in temp_df.columns:
-                    temp_df[col] = pd.to_numeric(temp_df[col], errors='coerce')
+                    temp_df[col] = pd.to_numeric(temp_df[col], errors='coerce',
+                                                 downcast=None if col in ('lat', 'lon') else 'float')
 
             temp_df['sensor_id'] = sensor_name
             df_list.append(temp_df)
+
+            if cache_file:
+                # Written beside the final name and swapped in, so an interrupted
+                # run never leaves a half-written cache that looks fresh
+                tmp_file = f"{cache_file}.tmp"
+                try:
+                    temp_df.to_parquet(tmp_file, compression='zstd', index=False)
+                    os.replace(tmp_file, cache_file)
+                except (OSError, TypeError, ValueError, pyarrow.ArrowException):
+                    # Mixed-type object columns can't be stored; just re-parse next run
+                    if os.path.exists(tmp_file): os.remove(tmp_file)
         except Exception as e:
             pass 
 
     if not df_list: return pd.DataFrame()
+    # Single-day sensors skip the concat copy entirely
+    if len(df_list) == 1: return df_list[0]
     return pd.concat(df_list, ignore_index=True)
 
 if __name__ == "__main__":
@@ -86,7 +123,11 @@ if __name__ == "__main__":
     df_east  = load_and_normalize("sensor-east",  "*aircraft_log*.csv*", is_legacy_format=False)
     df_west  = load_and_normalize("sensor-west",  "*aircraft_log*.csv*", is_legacy_format=False)
 
-    df_final = pd.concat([df_north, df_east, df_west], ignore_index=True)
+    frames = [df for df in (df_north, df_east, df_west) if not df.empty]
+    df_final = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    # Three sensor names repeated on every row: categorical instead of object strings
+    if 'sensor_id' in df_final.columns:
+        df_final['sensor_id'] = df_final['sensor_id'].astype('category')
     raw_count = len(df_final)
     log_msg(f"📥 Raw Data Ingested: {raw_count:,} rows")
 
@@ -173,3 +214,11 @@ if __name__ == "__main__":
     output_file = os.path.join(OUTPUT_DIR, "training_dataset_v4_ensemble.csv")
     df_clean.to_csv(output_file, index=False)
     log_msg(f"💾 Saved Ensemble Training Set: {output_file}")
+    # Typed columnar copy for downstream loaders; the CSV stays the reference format
+    if CACHE_DIR:
+        parquet_file = os.path.splitext(output_file)[0] + ".parquet"
+        try:
+            df_clean.to_parquet(parquet_file, compression='zstd', index=False)
+            log_msg(f"💾 Saved Parquet Copy: {parquet_file}")
+        except (OSError, TypeError, ValueError, pyarrow.ArrowException) as e:
+            log_msg(f"⚠️ Parquet copy skipped: {e}")
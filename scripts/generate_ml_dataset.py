@@ -17,6 +17,11 @@ RAW_DIR = "research_data/2026-01-11"
 OUTPUT_DIR = "research_data/ml_ready"
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
+# Unit constants for the kinematic features
+M_PER_DEG = 111000
+DEG_TO_RAD = np.pi / 180
+KNOTS_TO_MS = 0.514444
+
 def load_and_normalize(sensor_name, file_pattern, is_legacy_format=False):
     """Reads CSV, fixes timestamps to UTC-Aware, and standardizes columns."""
     files = glob.glob(os.path.join(RAW_DIR, sensor_name, file_pattern))
@@ -79,22 +84,36 @@ print("⚙️  Engineering Features...")
 # Sort (Now safe because everything is UTC-Aware)
 df_clean = df_clean.sort_values(by=['hex', 'timestamp'])
 
-# Calculate Time Delta & Distance Delta
-df_clean['time_gap'] = df_clean.groupby('hex')['timestamp'].diff().dt.total_seconds()
-df_clean['lat_diff'] = df_clean.groupby('hex')['lat'].diff()
-df_clean['lon_diff'] = df_clean.groupby('hex')['lon'].diff()
-
-# Approx Distance (Meters)
-df_clean['dist_delta_approx_m'] = np.sqrt(
-    (df_clean['lat_diff'] * 111000)**2 + 
-    (df_clean['lon_diff'] * 111000 * np.cos(np.radians(df_clean['lat'])))**2
+# Calculate Time Delta & Distance Delta (one grouped pass for all three)
+deltas = df_clean.groupby('hex')[['timestamp', 'lat', 'lon']].diff()
+time_gap = deltas['timestamp'].dt.total_seconds().to_numpy()
+lat_diff = deltas['lat'].to_numpy()
+lon_diff = deltas['lon'].to_numpy()
+
+# Approx Distance (Meters) - one NumPy pass over plain arrays;
+# the cos(lat) scaling and final multiply reuse their buffers in place
+lon_scale = df_clean['lat'].to_numpy() * DEG_TO_RAD
+np.cos(lon_scale, out=lon_scale)
+lon_scale *= lon_diff
+dist_delta = np.hypot(lat_diff, lon_scale)
+dist_delta *= M_PER_DEG
+
+# Velocities (zero time gaps give inf, as before)
+with np.errstate(divide='ignore', invalid='ignore'):
+    calc_velocity = dist_delta / time_gap
+reported_velocity = df_clean['ground_speed'].to_numpy() * KNOTS_TO_MS
+
+# Attach all features in one step instead of growing the frame column by column
+df_clean = df_clean.assign(
+    time_gap=time_gap,
+    lat_diff=lat_diff,
+    lon_diff=lon_diff,
+    dist_delta_approx_m=dist_delta,
+    calc_velocity_ms=calc_velocity,
+    reported_velocity_ms=reported_velocity,
+    velocity_discrepancy=np.abs(calc_velocity - reported_velocity),
 )
 
-# Velocities
-df_clean['calc_velocity_ms'] = df_clean['dist_delta_approx_m'] / df_clean['time_gap']
-df_clean['reported_velocity_ms'] = df_clean['ground_speed'] * 0.514444
-df_clean['velocity_discrepancy'] = abs(df_clean['calc_velocity_ms'] - df_clean['reported_velocity_ms'])
-
 # 5. Export
 output_file = os.path.join(OUTPUT_DIR, "training_dataset_20260111.csv")
 df_clean.to_csv(output_file, index=False)
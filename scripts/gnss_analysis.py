@@ -56,6 +56,7 @@ def load_data():
     
     pps_data = []
     pos_data = []
+    pos_frames = []
     
     for f in gnss_files:
         sid = "unknown"
@@ -66,19 +67,17 @@ def load_data():
             # CSV (East/West)
             if "gnss_log" in f.name:
                 try:
-                    if f.suffix == '.gz':
-                        with gzip.open(f, 'rt') as gf:
-                            df = pd.read_csv(gf, on_bad_lines='skip')
-                    else:
-                        df = pd.read_csv(f, on_bad_lines='skip')
+                    # pandas infers .gz and feeds the zlib stream straight to
+                    # the C parser; no text-mode wrapper decoding in Python
+                    df = pd.read_csv(f, on_bad_lines='skip')
                     
                     df.columns = df.columns.str.lower().str.strip()
                     if 'lat' in df.columns and 'lon' in df.columns:
-                        temp = df[['lat', 'lon']].copy()
-                        temp['sensor_id'] = sid
-                        temp['lat'] = pd.to_numeric(temp['lat'], errors='coerce')
-                        temp['lon'] = pd.to_numeric(temp['lon'], errors='coerce')
-                        pos_data.extend(temp.dropna().to_dict('records'))
+                        # One float block and one NaN mask; no per-row dicts
+                        ll = np.column_stack([pd.to_numeric(df['lat'], errors='coerce'),
+                                              pd.to_numeric(df['lon'], errors='coerce')]).astype(float)
+                        ll = ll[~np.isnan(ll).any(axis=1)]
+                        pos_frames.append(pd.DataFrame({'sensor_id': sid, 'lat': ll[:, 0], 'lon': ll[:, 1]}))
                 except: pass
 
             # Raw (North)
@@ -111,7 +110,8 @@ def load_data():
         except: pass
 
     df_pps = pd.DataFrame(pps_data)
-    df_pos = pd.DataFrame(pos_data)
+    pos_frames = [d for d in (pd.DataFrame(pos_data), *pos_frames) if not d.empty]
+    df_pos = pd.concat(pos_frames, ignore_index=True) if pos_frames else pd.DataFrame()
     
     if not df_pos.empty:
         df_pos = df_pos[(df_pos['lat'].abs() > 1.0) & (df_pos['lon'].abs() > 1.0)]
@@ -119,12 +119,12 @@ def load_data():
     print("\n[GNSS] 📊 Data Extraction Audit:")
     print(f"{'Sensor ID':<15} | {'PPS Samples':<12} | {'Valid Fixes':<15}")
     print("-" * 46)
-    all_sensors = set()
-    if not df_pos.empty: all_sensors.update(df_pos['sensor_id'].unique())
-    if not df_pps.empty: all_sensors.update(df_pps['sensor_id'].unique())
-    for s in sorted(all_sensors):
-        n_pps = len(df_pps[df_pps['sensor_id'] == s]) if not df_pps.empty else 0
-        n_pos = len(df_pos[df_pos['sensor_id'] == s]) if not df_pos.empty else 0
+    # One counting pass per frame instead of a boolean mask + copy per sensor
+    pps_counts = df_pps['sensor_id'].value_counts() if not df_pps.empty else pd.Series(dtype=int)
+    pos_counts = df_pos['sensor_id'].value_counts() if not df_pos.empty else pd.Series(dtype=int)
+    for s in sorted(set(pps_counts.index) | set(pos_counts.index)):
+        n_pps = pps_counts.get(s, 0)
+        n_pos = pos_counts.get(s, 0)
         print(f"{s:<15} | {n_pps:<12} | {n_pos:<15}")
     print("-" * 46 + "\n")
 
@@ -151,8 +151,8 @@ def generate_plot(df_pps, df_pos, output_dir):
 
     ax2 = fig.add_subplot(gs[0, 1])
     if not df_pos.empty:
-        df_pos['lat_mean'] = df_pos.groupby('sensor_id')['lat'].transform('mean')
-        df_pos['lon_mean'] = df_pos.groupby('sensor_id')['lon'].transform('mean')
+        # Both per-sensor means from one grouped pass
+        df_pos[['lat_mean', 'lon_mean']] = df_pos.groupby('sensor_id')[['lat', 'lon']].transform('mean').to_numpy()
         df_pos['north_m'] = (df_pos['lat'] - df_pos['lat_mean']) * 111320
         df_pos['east_m'] = (df_pos['lon'] - df_pos['lon_mean']) * 55800 
         
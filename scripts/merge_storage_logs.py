@@ -18,23 +18,23 @@ def main():
         return
 
     # 2. Extract Data
-    new_records = []
+    # Column lists (not a list of row dicts) so each dtype is inferred once
+    new_records = {'timestamp': [], 'node_name': [], 'disk_used_kb': [], 'recording_size_kb': []}
     for f in raw_files:
         try:
             df = pd.read_csv(f)
             if 'disk_usage' in df.columns:
                 node = os.path.basename(f).split('_stats_log')[0]
                 latest = df.iloc[-1]
-                new_records.append({
-                    'timestamp': latest['timestamp'],
-                    'node_name': node,
-                    'disk_used_kb': float(latest['disk_usage']) * 10000, 
-                    'recording_size_kb': 0
-                })
+                disk_used_kb = float(latest['disk_usage']) * 10000
+                new_records['timestamp'].append(latest['timestamp'])
+                new_records['node_name'].append(node)
+                new_records['disk_used_kb'].append(disk_used_kb)
+                new_records['recording_size_kb'].append(0)
         except: pass
 
     # 3. Merge & Save
-    if new_records:
+    if new_records['timestamp']:
         if os.path.exists(HISTORY_FILE):
             df_hist = pd.read_csv(HISTORY_FILE)
         else:
@@ -58,10 +58,10 @@ def load_data():
             raw_id = basename.split('_')[0] 
             sensor_name = SENSOR_MAP.get(raw_id, raw_id)
             
-            # Data Type Enforcement
+            # Data Type Enforcement (dBFS levels fit float32 with room to spare)
             df['timestamp'] = pd.to_datetime(df['timestamp'], errors='coerce')
-            df['peak_signal'] = pd.to_numeric(df['peak_signal'], errors='coerce')
-            df['noise'] = pd.to_numeric(df['noise'], errors='coerce')
+            df['peak_signal'] = pd.to_numeric(df['peak_signal'], errors='coerce', downcast='float')
+            df['noise'] = pd.to_numeric(df['noise'], errors='coerce', downcast='float')
             df['sensor'] = sensor_name
             
             dfs.append(df)
@@ -73,6 +73,7 @@ def load_data():
         return pd.DataFrame()
 
     master_df = pd.concat(dfs, ignore_index=True)
+    master_df['sensor'] = master_df['sensor'].astype('category')
     master_df.dropna(subset=['timestamp', 'peak_signal'], inplace=True)
     master_df.sort_values('timestamp', inplace=True)
     return master_df
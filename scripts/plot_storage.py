@@ -43,9 +43,9 @@ def main():
     # Setup Plot
     plt.figure(figsize=(10, 6))
     
-    nodes = df['node_name'].unique()
-    for node in nodes:
-        subset = df[df['node_name'] == node].sort_values('timestamp')
+    # One grouping pass instead of a full-frame mask per node (first-seen order kept)
+    for node, subset in df.groupby('node_name', sort=False):
+        subset = subset.sort_values('timestamp')
         plt.plot(subset['timestamp'], subset['disk_used_kb'], label=node, marker='o')
 
     plt.title(f"Grid Storage Usage (v0.4.9)")
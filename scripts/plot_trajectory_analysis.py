@@ -8,12 +8,16 @@
 """
 import pandas as pd
 import matplotlib.pyplot as plt
-import seaborn as sns
 import glob
 import os
 
 DATA_DIR = "research_data"
 OUTPUT_DIR = "output/plots"
+MAX_PLOT_POINTS = 200_000  # more than the 300 dpi map can resolve
+
+def thin(df, n=MAX_PLOT_POINTS):
+    """Deterministic subsample so render cost stays bounded on multi-day logs."""
+    return df if len(df) <= n else df.sample(n, random_state=0)
 
 def load_aircraft_data():
     files = glob.glob(f"{DATA_DIR}/**/*aircraft_log*.csv", recursive=True)
@@ -26,7 +30,9 @@ def load_aircraft_data():
     for f in files:
         try:
             # FORCE ALL TO STRING to prevent "Mixed Type" crash
-            df = pd.read_csv(f, names=cols, header=None, on_bad_lines='skip', dtype=str)
+            # Parsed at full width so over-wide rows are still skipped as bad
+            # lines (usecols would silently truncate them); only lat/lon are kept.
+            df = pd.read_csv(f, names=cols, header=None, on_bad_lines='skip', dtype=str)[['lat', 'lon']]
             
             # Identify Sensor
             sensor = "Unknown"
@@ -57,7 +63,9 @@ def plot_coverage(df):
     
     # Plot with error handling for empty data
     try:
-        sns.scatterplot(data=df, x='lon', y='lat', hue='sensor', s=15, alpha=0.5, palette='bright', edgecolor=None)
+        # Plain matplotlib, one layer per sensor: seaborn was only imported for this call
+        for sensor, pts in thin(df).groupby('sensor'):
+            plt.scatter(pts['lon'], pts['lat'], s=15, alpha=0.5, label=sensor, edgecolors='none', rasterized=True)
         
         plt.title(f"Grid Coverage Analysis: Captured Trajectories ({len(df)} points)")
         plt.xlabel("Longitude")
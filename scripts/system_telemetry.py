@@ -19,6 +19,7 @@
 #              Restrict access:      chmod 600 /etc/securing-skies/mqtt_secret
 # ==============================================================================
 import json
+import os
 import socket
 import ssl
 import sys
@@ -57,9 +58,8 @@ def get_cpu_temp() -> float:
 
 
 def get_cpu_load() -> float:
-    """Return the 1-minute load average from /proc/loadavg."""
-    with open("/proc/loadavg", "r") as fh:
-        return float(fh.read().split()[0])
+    """Return the 1-minute load average (getloadavg(3), no /proc text parsing)."""
+    return round(os.getloadavg()[0], 2)  # /proc/loadavg precision
 
 
 def build_payload() -> dict:
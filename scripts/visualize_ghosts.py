@@ -4,7 +4,10 @@
 # [VERSION] 3.0.0 (Renumbered D7-D10)
 # ------------------------------------------------------------------
 
+import numpy as np
 import pandas as pd
+import matplotlib
+matplotlib.use('Agg')  # batch PNG output only
 import matplotlib.pyplot as plt
 import seaborn as sns
 from pathlib import Path
@@ -22,7 +25,10 @@ def visualize():
     
     # Re-run lightweight ML
     features = ['lat', 'lon', 'alt', 'ground_speed', 'track', 'rssi']
-    X = df[features].fillna(df[features].median())
+    # Median imputation on one float32 block, the dtype IsolationForest's trees use anyway
+    X = df[features].to_numpy(dtype=np.float32, copy=True)
+    nan_rows, nan_cols = np.nonzero(np.isnan(X))
+    X[nan_rows, nan_cols] = np.nanmedian(X, axis=0)[nan_cols]
     iso = IsolationForest(n_estimators=100, contamination=0.01, random_state=42)
     df['score'] = iso.fit_predict(X)
     df['confidence'] = iso.decision_function(X)
@@ -34,8 +40,11 @@ def visualize():
     # --- D7: Confidence Stats ---
     print("   🎨 Generating D7 (Confidence Dist)...")
     plt.figure(figsize=(10,6))
-    sns.histplot(df['confidence'], bins=50, kde=True, color="green", label="Normal")
-    sns.histplot(ghosts['confidence'], bins=50, kde=True, color="red", label="Anomaly")
+    # Bin with NumPy and draw step outlines; each series keeps its own 50 bins
+    # so the narrow anomaly tail stays resolved
+    for conf, color, label in ((df['confidence'], "green", "Normal"), (ghosts['confidence'], "red", "Anomaly")):
+        counts, edges = np.histogram(conf.to_numpy(dtype=np.float32), bins=50)
+        plt.stairs(counts, edges, fill=True, color=color, alpha=0.5, label=label)
     plt.title(f"D7: Anomaly Confidence Distribution | Gen: {t_str}")
     plt.legend()
     plt.savefig(OUT_DIR / "D7_Ghost_Confidence.png")
@@ -44,8 +53,8 @@ def visualize():
     # --- D8: Confidence Map ---
     print("   🎨 Generating D8 (Conf Map)...")
     plt.figure(figsize=(10,8))
-    plt.scatter(df['lon'], df['lat'], c='lightgray', s=1, alpha=0.1)
-    sc = plt.scatter(ghosts['lon'], ghosts['lat'], c=ghosts['confidence'], cmap='inferno', s=5)
+    plt.scatter(df['lon'], df['lat'], c='lightgray', s=1, alpha=0.1, rasterized=True)
+    sc = plt.scatter(ghosts['lon'], ghosts['lat'], c=ghosts['confidence'], cmap='inferno', s=5, rasterized=True)
     plt.colorbar(sc, label="Anomaly Score")
     plt.title(f"D8: Spatial Confidence Map | Gen: {t_str}")
     plt.savefig(OUT_DIR / "D8_Ghost_Map_Confidence.png")
@@ -54,7 +63,7 @@ def visualize():
     # --- D9: Spatial Clusters ---
     print("   🎨 Generating D9 (Spatial Clusters)...")
     plt.figure(figsize=(10,8))
-    sns.scatterplot(data=ghosts, x='lon', y='lat', hue='sensor_id', s=10)
+    sns.scatterplot(data=ghosts, x='lon', y='lat', hue='sensor_id', s=10, rasterized=True)
     plt.title(f"D9: Ghost Clusters by Sensor | Gen: {t_str}")
     plt.savefig(OUT_DIR / "D9_Ghost_Map_Spatial.png")
     plt.close()
@@ -62,7 +71,7 @@ def visualize():
     # --- D10: Physics ---
     print("   🎨 Generating D10 (Physics)...")
     plt.figure(figsize=(10,6))
-    sns.scatterplot(data=ghosts, x='ground_speed', y='alt', hue='confidence', palette='viridis', s=10)
+    sns.scatterplot(data=ghosts, x='ground_speed', y='alt', hue='confidence', palette='viridis', s=10, rasterized=True)
     plt.title(f"D10: Impossible Physics | Gen: {t_str}")
     plt.savefig(OUT_DIR / "D10_Ghost_Physics.png")
     plt.close()